@@ -11,9 +11,12 @@ bl_info = {
 }
 
 import bpy
-import bmesh
+import functools
 import math
 
+# NumPy, and Numba when installed, are imported on first use rather than here so
+# that enabling the add-on stays cheap.
+
 # --- Gear Profile Generation ---
 # The following functions for generating the involute gear profile are a Python
 # port of the JavaScript implementation found in the "Planetary Gear Simulator".
@@ -24,10 +27,6 @@ import math
 # author, Leemon Baird, in 2011.
 # Original Source: http://www.thingiverse.com/thing:5505
 
-def polar(radius, angle):
-    """Converts polar coordinates to cartesian coordinates."""
-    return (radius * math.cos(angle), radius * math.sin(angle))
-
 def calculate_involute_angle(base_radius, radius):
     """Calculates the involute angle for a given radius."""
     if radius <= base_radius:
@@ -35,31 +34,23 @@ def calculate_involute_angle(base_radius, radius):
     # This is the core formula for the involute curve.
     return math.sqrt((radius / base_radius)**2 - 1) - math.acos(base_radius / radius)
 
-def get_involute_point(base_radius, side, angle_offset, radius):
-    """Gets a point on the involute curve."""
-    if radius < base_radius:
-        radius = base_radius
-    involute_angle = calculate_involute_angle(base_radius, radius)
-    return polar(radius, side * (involute_angle + angle_offset))
+def _involute_xy(base_radius, radii, side, angle_offset):
+    """Gets the points on the involute curve for an array of radii."""
+    import numpy as np
 
-def get_tooth_profile_point(fraction, root_radius, base_radius, outer_radius, angle_offset, side):
-    """Calculates a point on the tooth face, from root to tip."""
-    start_radius = max(base_radius, root_radius)
-    current_radius = (1 - fraction) * start_radius + fraction * outer_radius
-    return get_involute_point(base_radius, side, angle_offset, current_radius)
+    # Clamping to the base circle keeps sqrt/arccos in their domain, and both terms
+    # are exactly zero there, so no branch is needed
+    radii = np.maximum(radii, base_radius)
+    involute_angles = np.sqrt((radii / base_radius)**2 - 1) - np.arccos(base_radius / radii)
+    angles = side * (involute_angles + angle_offset)
+    return radii * np.cos(angles), radii * np.sin(angles)
 
-def rotate_point_2d(point, angle):
-    """Rotates a 2D point around the origin."""
-    x, y = point
-    cos_a, sin_a = math.cos(angle), math.sin(angle)
-    return (x * cos_a - y * sin_a, x * sin_a + y * cos_a)
+def _build_gear_verts_np(num_teeth, module, pressure_angle_rad, is_internal):
+    """Builds the x and y coordinates of a single gear profile with NumPy."""
+    import numpy as np
 
-def build_gear_verts(num_teeth, scale, is_internal=False, pressure_angle_deg=20.0):
-    """Builds the 2D vertices for a single gear profile."""
-    module = scale
     # Basic gear parameters
     pitch_radius = (module * num_teeth) / 2
-    pressure_angle_rad = math.radians(pressure_angle_deg)
     base_radius = pitch_radius * math.cos(pressure_angle_rad)
     
     # Addendum and Dedendum
@@ -71,78 +62,170 @@ def build_gear_verts(num_teeth, scale, is_internal=False, pressure_angle_deg=20.
     involute_angle_offset = -calculate_involute_angle(base_radius, pitch_radius) - half_tooth_thickness_angle / 2
 
     root_start_angle = involute_angle_offset if root_radius < base_radius else -math.pi / num_teeth
-    root_end_angle = -involute_angle_offset if root_radius < base_radius else math.pi / num_teeth
 
     # Generate one tooth profile
-    tooth_points = [polar(root_radius, root_start_angle)]
     num_segments = 5  # Number of segments for the curved tooth face
-    for i in range(num_segments + 1):
-        fraction = i / num_segments
-        tooth_points.append(get_tooth_profile_point(fraction, root_radius, base_radius, outer_radius, involute_angle_offset, 1))
-    
-    for i in range(num_segments, -1, -1):
-        fraction = i / num_segments
-        tooth_points.append(get_tooth_profile_point(fraction, root_radius, base_radius, outer_radius, involute_angle_offset, -1))
-        
-    tooth_points.append(polar(root_radius, root_end_angle))
-    
-    # Rotate the tooth profile to create the full gear
-    all_points = []
-    tooth_angle = 2 * math.pi / num_teeth
-    for i in range(num_teeth):
-        rotation = i * tooth_angle
-        for point in tooth_points:
-            all_points.append(rotate_point_2d(point, rotation))
-            
-    if is_internal:
-        all_points.reverse()
-    
-    if all_points:
-        all_points.append(all_points[0]) # Close the loop
-        
-    return all_points
+    fractions = np.linspace(0.0, 1.0, num_segments + 1)
+    start_radius = max(base_radius, root_radius)
+    radii = (1 - fractions) * start_radius + fractions * outer_radius
 
-def create_gear_object(name, num_teeth, scale, is_internal=False, thickness=1.0, pressure_angle_deg=20.0, ring_margin=4.0):
-    """Creates a gear mesh object from the calculated vertices."""
-    bm = bmesh.new()
-    verts_2d = build_gear_verts(num_teeth, scale, is_internal, pressure_angle_deg)
-    if not verts_2d:
-        return None
+    # Half a tooth from the root to the tip; the other half is its mirror, from tip to root.
+    # A root point halfway between two teeth is shared with the next tooth.
+    flank_x, flank_y = _involute_xy(base_radius, radii, 1, involute_angle_offset)
+    half_x = np.concatenate(([root_radius * math.cos(root_start_angle)], flank_x))
+    half_y = np.concatenate(([root_radius * math.sin(root_start_angle)], flank_y))
+    mirror_end = 0 if root_radius >= base_radius else None
+    tooth_x = np.concatenate((half_x, half_x[:mirror_end:-1]))
+    tooth_y = np.concatenate((half_y, -half_y[:mirror_end:-1]))
+
+    # Rotate the tooth profile to create the full gear, all teeth at once. Internal
+    # gears wind clockwise: the tooth is symmetric, so traversing it backwards is the
+    # same as mirroring it, and the teeth are laid out in the opposite direction.
+    winding = -1 if is_internal else 1
+    tooth_angle = winding * 2 * math.pi / num_teeth
+    rotations = np.exp(1j * tooth_angle * np.arange(num_teeth))
+    cos_r, sin_r = rotations.real[:, None], rotations.imag[:, None]
+    tooth_y = winding * tooth_y
+    xs = (cos_r * tooth_x - sin_r * tooth_y).ravel()
+    ys = (sin_r * tooth_x + cos_r * tooth_y).ravel()
+    return xs, ys
+
+@functools.lru_cache(maxsize=None)
+def _load_numba_builder():
+    """Imports the compiled profile builder, or returns None if Numba is unavailable.
 
+    Numba is only a speed-up, so any failure to import or compile the builder falls
+    back to NumPy. The builder is compiled here with the argument types of a real call,
+    so compile errors surface once instead of inside the operator.
+    """
     try:
-        if not is_internal:
-            # Create a simple face for an external gear
-            face_verts = [bm.verts.new((v[0], v[1], 0)) for v in verts_2d]
-            bm.faces.new(face_verts)
-        else:
-            # Create a ring for an internal gear
-            pitch_radius = (scale * num_teeth) / 2.0
-            ring_margin_size = scale * ring_margin
-            outer_radius = pitch_radius + (scale * 2) + ring_margin_size
-            num_outer_verts = max(num_teeth * 2, 64)
-            
-            outer_verts_2d = [polar(outer_radius, 2 * math.pi * i / num_outer_verts) for i in range(num_outer_verts)]
-            outer_verts_2d.append(outer_verts_2d[0])
+        from .fast_gear import build_gear_verts_nb
+        build_gear_verts_nb(4, 1.0, math.radians(20.0), False)
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"Warning: Numba gear builder unavailable, using NumPy instead ({e})")
+        return None
+    return build_gear_verts_nb
+
+@functools.lru_cache(maxsize=64)
+def _build_unit_gear(num_teeth, pressure_angle_deg, is_internal):
+    """Builds the x and y coordinates of a gear profile with a module of 1.
+
+    The profile scales linearly with the module, so it is cached per tooth count and
+    pressure angle. The returned arrays are shared and read-only.
+    """
+    build = _load_numba_builder() or _build_gear_verts_np
+    xs, ys = build(num_teeth, 1.0, math.radians(pressure_angle_deg), is_internal)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+    return xs, ys
 
-            outer_bverts = [bm.verts.new((v[0], v[1], 0)) for v in outer_verts_2d]
-            inner_bverts = [bm.verts.new((v[0], v[1], 0)) for v in verts_2d]
-            bm.faces.new(outer_bverts + inner_bverts)
-    except ValueError:
+def build_gear_verts(num_teeth, scale, is_internal=False, pressure_angle_deg=20.0):
+    """Builds the x and y coordinates of a single gear profile."""
+    xs, ys = _build_unit_gear(num_teeth, pressure_angle_deg, is_internal)
+    return xs * scale, ys * scale
+
+def fill_mesh(mesh, co, loop_vertices, loop_starts, loop_totals):
+    """Fills an empty mesh from flat vertex, loop and polygon arrays in bulk."""
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.loops.add(len(loop_vertices))
+    mesh.loops.foreach_set("vertex_index", loop_vertices)
+    mesh.polygons.add(len(loop_starts))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    # Newer Blender versions derive the polygon sizes from the loop starts
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+    mesh.update(calc_edges=True)
+
+def build_prism(xs, ys, cap_faces, boundary_loops, thickness):
+    """Builds the vertex, loop and polygon arrays of a flat shape extruded along Z.
+
+    cap_faces is an (F, K) array of counter-clockwise faces, and boundary_loops lists
+    the outline index loops with the shape on their left.
+    """
+    import numpy as np
+
+    num_verts = len(xs)
+    num_faces, face_size = cap_faces.shape
+    if thickness <= 0:
+        co = np.zeros((num_verts, 3), dtype=np.float32)
+        co[:, 0] = xs
+        co[:, 1] = ys
+        loop_totals = np.full(num_faces, face_size, dtype=np.int32)
+        return co, cap_faces.ravel(), _loop_starts(loop_totals), loop_totals
+
+    # Bottom layer at z=0, top layer at z=thickness
+    co = np.empty((2, num_verts, 3), dtype=np.float32)
+    co[:, :, 0] = xs
+    co[:, :, 1] = ys
+    co[0, :, 2] = 0.0
+    co[1, :, 2] = thickness
+    co = co.reshape(-1, 3)
+
+    # Bottom caps facing down, top caps facing up, then one quad per outline edge
+    sides = []
+    for loop in boundary_loops:
+        next_loop = np.roll(loop, -1)
+        sides.append(np.column_stack((loop, next_loop, next_loop + num_verts, loop + num_verts)).ravel())
+    loop_vertices = np.concatenate([cap_faces[:, ::-1].ravel(), (cap_faces + num_verts).ravel()] + sides)
+    num_sides = sum(len(loop) for loop in boundary_loops)
+    loop_totals = np.full(2 * num_faces + num_sides, 4, dtype=np.int32)
+    loop_totals[:2 * num_faces] = face_size
+    return co, loop_vertices, _loop_starts(loop_totals), loop_totals
+
+def _loop_starts(loop_totals):
+    """Gets the first loop index of each polygon from the polygon sizes."""
+    import numpy as np
+
+    loop_starts = np.zeros_like(loop_totals)
+    np.cumsum(loop_totals[:-1], out=loop_starts[1:])
+    return loop_starts
+
+def create_gear_mesh(name, num_teeth, scale, is_internal=False, thickness=1.0, pressure_angle_deg=20.0, ring_margin=4.0):
+    """Creates a gear mesh from the calculated vertices."""
+    import numpy as np
+
+    xs, ys = build_gear_verts(num_teeth, scale, is_internal, pressure_angle_deg)
+    num_verts = len(xs)
+    if num_verts < 3:
         print(f"Warning: Could not create face for {name}. Check gear parameters.")
-        bm.free()
         return None
 
-    # Extrude the face to give it thickness
-    if thickness > 0 and bm.faces:
-        res = bmesh.ops.extrude_face_region(bm, geom=bm.faces[:])
-        extruded_verts = [v for v in res['geom'] if isinstance(v, bmesh.types.BMVert)]
-        bmesh.ops.translate(bm, verts=extruded_verts, vec=(0, 0, thickness))
+    profile = np.arange(num_verts, dtype=np.int32)
+    if not is_internal:
+        # A simple face for an external gear
+        face_xs, face_ys = xs, ys
+        cap_faces = profile[None, :]
+        boundary_loops = [profile]
+    else:
+        # A ring for an internal gear: the outer circle gets one evenly spaced vertex per
+        # profile vertex, phase-aligned with the clockwise profile, and the two loops are
+        # joined by a strip of quads
+        pitch_radius = (scale * num_teeth) / 2.0
+        ring_margin_size = scale * ring_margin
+        outer_radius = pitch_radius + (scale * 2) + ring_margin_size
+
+        profile_angles = np.unwrap(np.arctan2(ys, xs))
+        outer_steps = 2 * math.pi * profile / num_verts
+        outer_angles = np.mean(profile_angles + outer_steps) - outer_steps
+        face_xs = np.concatenate((xs, outer_radius * np.cos(outer_angles)))
+        face_ys = np.concatenate((ys, outer_radius * np.sin(outer_angles)))
+        next_profile = np.roll(profile, -1)
+        cap_faces = np.column_stack((profile, next_profile, next_profile + num_verts, profile + num_verts))
+        boundary_loops = [profile, profile[::-1] + num_verts]
 
-    # Create mesh and object
+    # Create the extruded gear in bulk
     mesh = bpy.data.meshes.new(name)
-    bm.to_mesh(mesh)
-    bm.free()
-    
+    fill_mesh(mesh, *build_prism(face_xs, face_ys, cap_faces, boundary_loops, thickness))
+    return mesh
+
+def create_gear_object(name, num_teeth, scale, is_internal=False, thickness=1.0, pressure_angle_deg=20.0, ring_margin=4.0):
+    """Creates a gear mesh object from the calculated vertices."""
+    mesh = create_gear_mesh(name, num_teeth, scale, is_internal, thickness, pressure_angle_deg, ring_margin)
+    if mesh is None:
+        return None
     return bpy.data.objects.new(name, mesh)
 
 class PlanetaryGearProperties(bpy.types.PropertyGroup):
@@ -161,39 +244,46 @@ class OBJECT_OT_GeneratePlanetaryGears(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
+        import numpy as np
+
         props = context.window_manager.planetary_gear_props
+        sun_teeth, planet_teeth, num_planets = props.sun_teeth, props.planet_teeth, props.num_planets
         module, clearance = props.scale, props.clearance
-        ring_teeth = props.sun_teeth + 2 * props.planet_teeth
+        thickness, pressure_angle, ring_margin = props.thickness, props.pressure_angle, props.ring_margin
+        ring_teeth = sun_teeth + 2 * planet_teeth
+        objects = context.collection.objects
 
         # Create Sun Gear
-        sun_gear = create_gear_object("SunGear", props.sun_teeth, module, is_internal=False, thickness=props.thickness, pressure_angle_deg=props.pressure_angle)
+        sun_gear = create_gear_object("SunGear", sun_teeth, module, is_internal=False, thickness=thickness, pressure_angle_deg=pressure_angle)
         if sun_gear:
             # Rotate to align teeth properly
-            sun_gear.rotation_euler.z = math.pi / props.sun_teeth if props.sun_teeth > 0 else 0
-            context.collection.objects.link(sun_gear)
+            sun_gear.rotation_euler.z = math.pi / sun_teeth if sun_teeth > 0 else 0
+            objects.link(sun_gear)
 
         # Create Ring Gear (adjust module for clearance)
         effective_module_for_ring = module + (4 * clearance) / ring_teeth if ring_teeth > 0 else module
-        ring_gear = create_gear_object("RingGear", ring_teeth, effective_module_for_ring, is_internal=True, thickness=props.thickness, pressure_angle_deg=props.pressure_angle, ring_margin=props.ring_margin)
+        ring_gear = create_gear_object("RingGear", ring_teeth, effective_module_for_ring, is_internal=True, thickness=thickness, pressure_angle_deg=pressure_angle, ring_margin=ring_margin)
         if ring_gear:
-            context.collection.objects.link(ring_gear)
+            objects.link(ring_gear)
 
         # Create Planet Gears
-        planet_gear_template = create_gear_object("PlanetGearTemplate", props.planet_teeth, module, is_internal=False, thickness=props.thickness, pressure_angle_deg=props.pressure_angle)
-        if planet_gear_template:
-            orbit_radius = ((props.sun_teeth + props.planet_teeth) * module) / 2.0 + clearance
-            rotation_ratio = 1 + props.sun_teeth / props.planet_teeth if props.planet_teeth > 0 else 1
+        planet_gear_mesh = create_gear_mesh("PlanetGear", planet_teeth, module, is_internal=False, thickness=thickness, pressure_angle_deg=pressure_angle)
+        if planet_gear_mesh:
+            orbit_radius = ((sun_teeth + planet_teeth) * module) / 2.0 + clearance
+            rotation_ratio = 1 + sun_teeth / planet_teeth if planet_teeth > 0 else 1
             
-            for i in range(props.num_planets):
-                angle = 2 * math.pi * i / props.num_planets
-                planet_gear = bpy.data.objects.new(f"PlanetGear_{i+1}", planet_gear_template.data)
-                planet_gear.location = (orbit_radius * math.cos(angle), orbit_radius * math.sin(angle), 0)
-                # Rotate planet to mesh with sun gear
-                planet_gear.rotation_euler.z = math.pi - angle * rotation_ratio
-                context.collection.objects.link(planet_gear)
-            
-            # Clean up template object
-            bpy.data.objects.remove(planet_gear_template)
+            angles = np.linspace(0.0, 2 * math.pi, num_planets, endpoint=False)
+            xs = (orbit_radius * np.cos(angles)).tolist()
+            ys = (orbit_radius * np.sin(angles)).tolist()
+            # Rotate planets to mesh with sun gear
+            rotations = (math.pi - angles * rotation_ratio).tolist()
+
+            new_object = bpy.data.objects.new
+            for i, (x, y, rotation) in enumerate(zip(xs, ys, rotations)):
+                planet_gear = new_object(f"PlanetGear_{i+1}", planet_gear_mesh)
+                planet_gear.location = (x, y, 0)
+                planet_gear.rotation_euler.z = rotation
+                objects.link(planet_gear)
             
         return {'FINISHED'}
 
@@ -244,6 +334,7 @@ def register():
     bpy.types.WindowManager.planetary_gear_props = bpy.props.PointerProperty(type=PlanetaryGearProperties)
 
 def unregister():
+    _build_unit_gear.cache_clear()
     del bpy.types.WindowManager.planetary_gear_props
     for cls in reversed(classes_to_register):
         bpy.utils.unregister_class(cls)
@@ -0,0 +1,59 @@
+# Numba-compiled gear profile builder. This module is only imported when Numba is
+# installed; __init__.py falls back to the NumPy builder otherwise.
+
+import math
+
+import numba
+import numpy as np
+
+@numba.njit(cache=True)
+def build_gear_verts_nb(num_teeth, module, pressure_angle_rad, is_internal):
+    """Builds the x and y coordinates of a single gear profile as a compiled loop."""
+    # Basic gear parameters, as in _build_gear_verts_np
+    pitch_radius = (module * num_teeth) / 2
+    base_radius = pitch_radius * math.cos(pressure_angle_rad)
+    outer_radius = pitch_radius + module
+    root_radius = pitch_radius - (module * 1.25)
+
+    half_tooth_thickness_angle = (module * math.pi / 2) / pitch_radius if pitch_radius > 0 else 0.0
+    pitch_involute_angle = 0.0
+    if pitch_radius > base_radius:
+        pitch_involute_angle = math.sqrt((pitch_radius / base_radius)**2 - 1) - math.acos(base_radius / pitch_radius)
+    involute_angle_offset = -pitch_involute_angle - half_tooth_thickness_angle / 2
+
+    root_start_angle = involute_angle_offset if root_radius < base_radius else -math.pi / num_teeth
+
+    # Half a tooth from the root to the tip
+    num_segments = 5
+    half_len = num_segments + 2
+    half_x = np.empty(half_len)
+    half_y = np.empty(half_len)
+    half_x[0] = root_radius * math.cos(root_start_angle)
+    half_y[0] = root_radius * math.sin(root_start_angle)
+    start_radius = max(base_radius, root_radius)
+    for i in range(num_segments + 1):
+        fraction = i / num_segments
+        radius = max((1 - fraction) * start_radius + fraction * outer_radius, base_radius)
+        angle = math.sqrt((radius / base_radius)**2 - 1) - math.acos(base_radius / radius) + involute_angle_offset
+        half_x[i + 1] = radius * math.cos(angle)
+        half_y[i + 1] = radius * math.sin(angle)
+
+    # Mirror the half tooth and rotate it into every tooth position. A root point
+    # halfway between two teeth is shared with the next tooth.
+    winding = -1.0 if is_internal else 1.0
+    tooth_angle = winding * 2 * math.pi / num_teeth
+    tooth_len = 2 * half_len - 1 if root_radius >= base_radius else 2 * half_len
+    xs = np.empty(num_teeth * tooth_len)
+    ys = np.empty(num_teeth * tooth_len)
+    for k in range(num_teeth):
+        cos_r = math.cos(k * tooth_angle)
+        sin_r = math.sin(k * tooth_angle)
+        for j in range(tooth_len):
+            if j < half_len:
+                x, y = half_x[j], half_y[j]
+            else:
+                x, y = half_x[2 * half_len - 1 - j], -half_y[2 * half_len - 1 - j]
+            y *= winding
+            xs[k * tooth_len + j] = cos_r * x - sin_r * y
+            ys[k * tooth_len + j] = sin_r * x + cos_r * y
+    return xs, ys